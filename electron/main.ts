@@ -1111,7 +1111,12 @@ function startBlinkDetector() {
 		? path.join(process.resourcesPath, 'app.asar.unpacked', 'electron', 'resources', 'blink_detector')
 		: path.join(process.env.APP_ROOT, 'electron', 'resources', 'blink_detector');
 
-	const executablePath = process.platform === 'win32' ? binaryPath + '.exe' : binaryPath;
+	const executableName = process.platform === 'win32' ? 'blink_detector.exe' : 'blink_detector';
+	// onedir builds install a blink_detector/ folder holding the executable; onefile builds install the executable itself
+	const onedirExecutablePath = path.join(binaryPath, executableName);
+	const executablePath = existsSync(onedirExecutablePath)
+		? onedirExecutablePath
+		: path.join(path.dirname(binaryPath), executableName);
 
 	if (!existsSync(executablePath)) {
 		console.error('Blink detector binary not found. Please run the build script first: cd python && ./build_and_install.sh');
@@ -1,7 +1,9 @@
 import cv2
 import numpy as np
 import time
+import io
 import json
+import orjson
 import sys
 import os
 import dlib
@@ -9,14 +11,43 @@ from pathlib import Path
 import threading
 import queue
 import base64
-from collections import deque
 import statistics
+import math
+from numba import njit
+
+# Debug messages are skipped entirely unless enabled here
+DEBUG = False
+
+# Numba's on-disk cache locates functions through their .py source, which a
+# PyInstaller bundle doesn't ship; frozen builds compile at startup instead
+NUMBA_CACHE = not getattr(sys, "frozen", False)
 
 # Core detection parameters
 BLINK_COOLDOWN = 0.3
 TARGET_FPS = 10
 PROCESSING_RESOLUTION = (320, 240) 
 BLINK_DISPLAY_DURATION = 0.2
+VIDEO_STREAM_RESOLUTION = (640, 480)
+# Stream every Nth processed frame to the preview window
+VIDEO_STREAM_EVERY = 2
+# faceData messages are only sent when something visible changed: the EAR
+# moved by at least FACE_DATA_EAR_EPSILON, the face centre moved by at least
+# FACE_DATA_CENTER_EPSILON pixels, face presence, blink flag or blink_phase
+# changed, or the blink flag is set. A message is always sent at least every
+# FACE_DATA_MAX_INTERVAL seconds so consumers can treat silence as "unchanged"
+FACE_DATA_EAR_EPSILON = 0.003
+FACE_DATA_CENTER_EPSILON = 1.0
+FACE_DATA_MAX_INTERVAL = 1.0
+# Run the face detector only every N frames and track the face in between
+DETECT_EVERY = 5
+
+# OpenCV SSD face detector, used instead of dlib's HOG detector when its model
+# files are present next to the landmark model
+FACE_DNN_PROTOTXT = "deploy.prototxt"
+FACE_DNN_MODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+FACE_DNN_INPUT_SIZE = (300, 300)
+FACE_DNN_MEAN = (104.0, 177.0, 123.0)
+FACE_DNN_CONFIDENCE = 0.5
 
 # Adaptive approach: requires both percentage drop AND absolute EAR drop
 # This prevents false blinks when baseline EAR is very low (small fluctuations 
@@ -24,6 +55,16 @@ BLINK_DISPLAY_DURATION = 0.2
 BLINK_MIN_EAR_DROP = 0.19
 BLINK_MIN_ABSOLUTE_EAR_DROP = 0.03
 
+ADAPTIVE_MIN_EAR = 0.15
+ADAPTIVE_MAX_EAR = 0.35
+ADAPTIVE_MAX_THRESHOLD = 0.20  # For very small eyes (less conservative)
+ADAPTIVE_MIN_THRESHOLD = 0.15  # For large eyes
+
+# Linear ramp folded into threshold = offset - slope * clamped_ear
+_ADAPTIVE_SLOPE = (ADAPTIVE_MAX_THRESHOLD - ADAPTIVE_MIN_THRESHOLD) / (ADAPTIVE_MAX_EAR - ADAPTIVE_MIN_EAR)
+_ADAPTIVE_OFFSET = ADAPTIVE_MAX_THRESHOLD + _ADAPTIVE_SLOPE * ADAPTIVE_MIN_EAR
+
+@njit(cache=NUMBA_CACHE)
 def get_adaptive_ear_drop_threshold(baseline_ear):
     """
     Calculate adaptive EAR drop percentage using a linear function.
@@ -32,189 +73,449 @@ def get_adaptive_ear_drop_threshold(baseline_ear):
     if baseline_ear <= 0.0:
         return BLINK_MIN_EAR_DROP  # Fallback to default
     
-    min_ear = 0.15
-    max_ear = 0.35
-    max_threshold = 0.20  # For very small eyes (less conservative)
-    min_threshold = 0.15  # For large eyes
-    
-    # Clamp baseline_ear to valid range
-    clamped_ear = max(min_ear, min(baseline_ear, max_ear))
-    
-    # Calculate slope for linear decrease
-    slope = (max_threshold - min_threshold) / (max_ear - min_ear)
-    
-    # Linear function: threshold decreases as EAR increases
-    threshold = max_threshold - slope * (clamped_ear - min_ear)
-    
-    return threshold
+    clamped_ear = min(ADAPTIVE_MAX_EAR, max(ADAPTIVE_MIN_EAR, baseline_ear))
+    return _ADAPTIVE_OFFSET - _ADAPTIVE_SLOPE * clamped_ear
 
 BLINK_DURATION_MIN = 0.1
 BLINK_DURATION_MAX = 0.6
 BLINK_RECOVERY_THRESHOLD = 0.7
 BASELINE_WINDOW_SIZE = 15
 
+def build_baseline_weights(window_size):
+    # Row n weights a partially filled ring holding n samples in slots 0..n-1
+    partial = np.zeros((window_size + 1, window_size), dtype=np.float32)
+    for count in range(1, window_size + 1):
+        partial[count, :count] = np.linspace(0.5, 1.0, count)
+    
+    # Row k weights a full ring whose oldest sample sits in slot k
+    rolled = np.stack([np.roll(partial[window_size], k) for k in range(window_size)])
+    return partial, rolled
+
+_PARTIAL_WEIGHTS, _ROLLED_WEIGHTS = build_baseline_weights(BASELINE_WINDOW_SIZE)
+_PARTIAL_WEIGHT_SUMS = _PARTIAL_WEIGHTS.sum(axis=1)
+_WEIGHTS_SUM = float(_ROLLED_WEIGHTS[0].sum())
+
 # System state
 SEND_VIDEO = False
 CAMERA_ACTIVE = False
 cap = None
 command_queue = queue.Queue()
+# Frames waiting for JPEG encoding; new frames are dropped while it is full
+_video_q = queue.Queue(maxsize=2)
 target_fps = TARGET_FPS
 processing_resolution = PROCESSING_RESOLUTION
+buffers = None
 last_blink_display_time = 0.0
 
-# Detection state - tracks blink progress and baseline
-baseline_ear_values = deque(maxlen=BASELINE_WINDOW_SIZE)
-current_baseline_ear = 0.0
-blink_in_progress = False
-blink_start_time = 0.0
-last_blink_time = 0.0
+# Detection state - tracks blink progress and baseline. Kept in NumPy arrays
+# so the Numba blink kernel can update it in place
+BLINK_STATE_BASELINE = 0
+BLINK_STATE_IN_PROGRESS = 1
+BLINK_STATE_START_TIME = 2
+BLINK_STATE_LAST_BLINK_TIME = 3
+BLINK_STATE_MAX_DROP = 4
+
+BLINK_STATUS_NONE = 0
+BLINK_STATUS_MONITORING = 1
+BLINK_STATUS_START = 2
+BLINK_STATUS_COMPLETE = 3
+
+_blink_state = np.zeros(5, dtype=np.float64)
+_ear_ring = np.zeros(BASELINE_WINDOW_SIZE, dtype=np.float32)
+_ear_ring_pos = np.zeros(2, dtype=np.int64)
 baseline_smoothing_factor = 0.3
-max_drop_percentage = 0.0
+
+# Face tracking state - cached detections reused between detector runs
+_last_faces = []
+_face_eye_offsets = []
+_frames_since_detect = 0
+
+# Last faceData values sent, used to suppress unchanged messages
+_last_emitted_face_detected = False
+_last_emitted_ear = 0.0
+_last_emitted_center = (0.0, 0.0)
+_last_emitted_blink = False
+_last_emitted_phase = None
+_last_face_data_time = 0.0
 
 _cached_json_strings = {
-    "no_face_data": json.dumps({"faceData": {
+    "no_face_data": orjson.dumps({"faceData": {
         "faceDetected": False,
         "ear": 0.0,
         "blink": False,
         "faceRect": {"x": 0, "y": 0, "width": 0, "height": 0},
         "eyeLandmarks": []
-    }})
+    }}) + b"\n"
 }
 
+# Output lines are queued as (bytes, flush) and written by a background thread
+# so the detection loop never blocks on stdout writes or flushes
+_out_q = queue.Queue()
+# Set by the writer when stdout is gone (e.g. Electron closed the pipe); the
+# main loop then shuts down and nothing more is queued
+_output_closed = threading.Event()
+# Routine output (faceData, video) is flushed at most this often
+OUTPUT_FLUSH_INTERVAL = 0.1
+STDOUT_BUFFER_SIZE = 65536
+
+def configure_stdout():
+    # Block-buffer stdout so routine messages are batched into few write syscalls;
+    # with PYTHONUNBUFFERED the binary layer is already the raw file
+    raw_stdout = getattr(sys.stdout.buffer, "raw", sys.stdout.buffer)
+    sys.stdout = io.TextIOWrapper(io.BufferedWriter(raw_stdout, buffer_size=STDOUT_BUFFER_SIZE),
+                                  encoding=sys.stdout.encoding, write_through=False)
+
+def _emit(message, flush=False):
+    # Messages are newline-delimited JSON; flush=True for anything actionable
+    if _output_closed.is_set():
+        return
+    _out_q.put((orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n", flush))
+
+def close_output(writer):
+    # The writer is a daemon thread, so anything still queued at exit would be
+    # lost; the None sentinel makes it write and flush the backlog, then stop
+    _out_q.put(None)
+    writer.join()
+
+def output_writer_thread():
+    pending = False
+    last_flush_time = time.monotonic()
+    
+    try:
+        while True:
+            try:
+                item = _out_q.get(timeout=OUTPUT_FLUSH_INTERVAL)
+                if item is None:
+                    sys.stdout.buffer.flush()
+                    return
+                line, flush = item
+                sys.stdout.buffer.write(line)
+                pending = True
+            except queue.Empty:
+                flush = pending
+            
+            now = time.monotonic()
+            if pending and (flush or now - last_flush_time >= OUTPUT_FLUSH_INTERVAL):
+                sys.stdout.buffer.flush()
+                pending = False
+                last_flush_time = now
+    except OSError:
+        # The reader is gone; point stdout at devnull so the interpreter's final
+        # flush doesn't raise again, and let the main loop shut down
+        _output_closed.set()
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+
+# dlib 68-point indices of the left (36-41) then right (42-47) eye
+EYE_LANDMARK_INDICES = tuple(range(36, 48))
+
 # Pre-allocated buffers for performance
 class PreallocatedBuffers:
     def __init__(self, max_points=68):
         self.landmarks_array = np.zeros((max_points, 2), dtype=np.int32)
-        self.left_eye = np.zeros((6, 2), dtype=np.int32)
-        self.right_eye = np.zeros((6, 2), dtype=np.int32)
+        # Left eye in row 0, right eye in row 1 so both EARs come from one call
+        self.both_eyes = np.zeros((2, 6, 2), dtype=np.float32)
         self.temp_frame = None
-        self.ear_diffs = np.zeros((3, 2), dtype=np.float32)
-        self.ear_distances = np.zeros(3, dtype=np.float32)
-        self.concatenated_eyes = np.zeros((12, 2), dtype=np.int32)
-        self.normalized_landmarks = [{"x": 0.0, "y": 0.0} for _ in range(12)]
+        self.gray = None
+        # Per-frame (1 / width, 1 / height) used to normalize landmarks
+        self.landmark_scale = np.zeros(2, dtype=np.float32)
+        self.norm_xy = np.zeros((12, 2), dtype=np.float32)
+    
+    def allocate_frame_buffers(self, resolution):
+        # Destinations for the per-frame resize and gray extraction
+        width, height = resolution
+        self.temp_frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.gray = np.empty((height, width), dtype=np.uint8)
 
-def calculate_ear_fast(eye_points, buffers):
-    buffers.ear_diffs[0] = eye_points[1] - eye_points[5]
-    buffers.ear_diffs[1] = eye_points[2] - eye_points[4]
-    buffers.ear_diffs[2] = eye_points[0] - eye_points[3]
-    
-    np.sum(buffers.ear_diffs**2, axis=1, out=buffers.ear_distances)
-    np.sqrt(buffers.ear_distances, out=buffers.ear_distances)
-    
-    return float((buffers.ear_distances[0] + buffers.ear_distances[1]) / (2.0 * buffers.ear_distances[2] + 1e-6))
+# Scalar EAR kernel compiled with Numba - six points per eye are too few for
+# NumPy's per-call dispatch overhead to pay off
+@njit(cache=NUMBA_CACHE, fastmath=True)
+def _ear(eye):
+    dx1 = eye[1, 0] - eye[5, 0]
+    dy1 = eye[1, 1] - eye[5, 1]
+    dx2 = eye[2, 0] - eye[4, 0]
+    dy2 = eye[2, 1] - eye[4, 1]
+    dx3 = eye[0, 0] - eye[3, 0]
+    dy3 = eye[0, 1] - eye[3, 1]
+    return (math.sqrt(dx1 * dx1 + dy1 * dy1) + math.sqrt(dx2 * dx2 + dy2 * dy2)) / (2.0 * math.sqrt(dx3 * dx3 + dy3 * dy3) + 1e-6)
+
+@njit(cache=NUMBA_CACHE, fastmath=True)
+def _ear_pair(both_eyes):
+    return _ear(both_eyes[0]), _ear(both_eyes[1])
+
+def calculate_ear_pair(both_eyes):
+    left_ear, right_ear = _ear_pair(both_eyes)
+    return float(left_ear), float(right_ear)
+
+def warmup_ear_kernel():
+    # Trigger JIT compilation up front so the first camera frame doesn't stall
+    _ear_pair(np.zeros((2, 6, 2), dtype=np.float32))
 
 def get_eye_landmarks_only(predictor, gray, face, buffers):
     shape = predictor(gray, face)
-    for i in range(6):
-        point = shape.part(36 + i)
-        buffers.left_eye[i, 0] = point.x
-        buffers.left_eye[i, 1] = point.y
-        
-        point = shape.part(42 + i)
-        buffers.right_eye[i, 0] = point.x
-        buffers.right_eye[i, 1] = point.y
+    parts = shape.parts()
+    
+    # One lookup per point; the flat coordinates land directly in the
+    # (2, 6, 2) layout as one bulk store
+    eye_parts = [parts[i] for i in EYE_LANDMARK_INDICES]
+    buffers.both_eyes.reshape(-1)[:] = np.fromiter(
+        (coord for point in eye_parts for coord in (point.x, point.y)),
+        dtype=np.float32, count=2 * len(EYE_LANDMARK_INDICES))
     
-    return buffers.left_eye, buffers.right_eye
+    return buffers.both_eyes
 
 _encode_params = [cv2.IMWRITE_JPEG_QUALITY, 70]
 def encode_frame(frame):
     _, buffer = cv2.imencode('.jpg', frame, _encode_params)
-    return base64.b64encode(buffer).decode('utf-8')
+    return base64.b64encode(buffer)
 
-def calculate_baseline_ear(ear_values):
+def video_encoder_thread():
+    while True:
+        frame = _video_q.get()
+        if frame.shape[1::-1] != VIDEO_STREAM_RESOLUTION:
+            frame = cv2.resize(frame, VIDEO_STREAM_RESOLUTION)
+        
+        # Base64 never needs JSON escaping, so the line is assembled as bytes
+        if not _output_closed.is_set():
+            _out_q.put((b'{"videoStream":"' + encode_frame(frame) + b'"}\n', False))
+
+@njit(cache=NUMBA_CACHE)
+def _push_baseline_ear(ring, ring_pos, ear):
+    # ring_pos holds [next write slot, number of samples]
+    ring[ring_pos[0]] = ear
+    ring_pos[0] = (ring_pos[0] + 1) % ring.shape[0]
+    if ring_pos[1] < ring.shape[0]:
+        ring_pos[1] += 1
+
+@njit(cache=NUMBA_CACHE)
+def _calculate_baseline_ear(ring, ring_pos, partial_weights, partial_weight_sums, rolled_weights, weights_sum):
     # Weighted average gives recent values more influence for faster adaptation
-    if len(ear_values) < 5:
-        return None
-    
-    weights = np.linspace(0.5, 1.0, len(ear_values))
-    weighted_sum = np.sum(np.array(ear_values) * weights)
-    total_weight = np.sum(weights)
+    count = ring_pos[1]
+    if count < ring.shape[0]:
+        weights = partial_weights[count]
+        total_weight = partial_weight_sums[count]
+    else:
+        # Once the ring is full the next write slot holds the oldest sample
+        weights = rolled_weights[ring_pos[0]]
+        total_weight = weights_sum
     
+    weighted_sum = 0.0
+    for i in range(ring.shape[0]):
+        weighted_sum += ring[i] * weights[i]
     return weighted_sum / total_weight
 
-def detect_blink_advanced(current_ear, current_time):
-    global baseline_ear_values, current_baseline_ear, blink_in_progress, blink_start_time, last_blink_time, max_drop_percentage
-    
-    baseline_ear_values.append(current_ear)
+@njit(cache=NUMBA_CACHE)
+def _blink_step_numba(current_ear, current_time, state, ring, ring_pos, partial_weights, partial_weight_sums, rolled_weights, weights_sum, smoothing_factor):
+    # Returns (status, baseline, drop, max_drop_ear, duration, threshold)
+    _push_baseline_ear(ring, ring_pos, current_ear)
     
     # Update baseline with exponential smoothing for responsive adaptation
-    if len(baseline_ear_values) >= 5:
-        new_baseline = calculate_baseline_ear(baseline_ear_values)
-        if new_baseline:
-            if current_baseline_ear > 0:
-                current_baseline_ear = (baseline_smoothing_factor * new_baseline + 
-                                      (1 - baseline_smoothing_factor) * current_baseline_ear)
-            else:
-                current_baseline_ear = new_baseline
-    else:
-        return False, None
+    if ring_pos[1] < 5:
+        return BLINK_STATUS_NONE, 0.0, 0.0, 0.0, 0.0, 0.0
     
-    if current_baseline_ear <= 0:
-        return False, None
-        
-    ear_drop_percentage = (current_baseline_ear - current_ear) / current_baseline_ear
-    ear_drop_absolute = current_baseline_ear - current_ear
+    new_baseline = _calculate_baseline_ear(ring, ring_pos, partial_weights, partial_weight_sums, rolled_weights, weights_sum)
+    if new_baseline != 0.0:
+        if state[BLINK_STATE_BASELINE] > 0:
+            state[BLINK_STATE_BASELINE] = (smoothing_factor * new_baseline +
+                                           (1 - smoothing_factor) * state[BLINK_STATE_BASELINE])
+        else:
+            state[BLINK_STATE_BASELINE] = new_baseline
+    
+    baseline_ear = state[BLINK_STATE_BASELINE]
+    if baseline_ear <= 0:
+        return BLINK_STATUS_NONE, 0.0, 0.0, 0.0, 0.0, 0.0
+    
+    ear_drop_percentage = (baseline_ear - current_ear) / baseline_ear
+    ear_drop_absolute = baseline_ear - current_ear
     
     # Get adaptive threshold based on baseline EAR size
-    adaptive_threshold = get_adaptive_ear_drop_threshold(current_baseline_ear)
+    adaptive_threshold = get_adaptive_ear_drop_threshold(baseline_ear)
     
     # Start blink detection when both percentage and absolute drop thresholds are met
-    if (not blink_in_progress and 
-        ear_drop_percentage > adaptive_threshold and 
-        ear_drop_absolute > BLINK_MIN_ABSOLUTE_EAR_DROP and 
+    if (state[BLINK_STATE_IN_PROGRESS] == 0.0 and
+        ear_drop_percentage > adaptive_threshold and
+        ear_drop_absolute > BLINK_MIN_ABSOLUTE_EAR_DROP and
         ear_drop_percentage > 0):
-        blink_in_progress = True
-        blink_start_time = current_time
-        max_drop_percentage = ear_drop_percentage
-        return False, {"baseline": current_baseline_ear, "drop": ear_drop_percentage, "phase": "start", "threshold": adaptive_threshold}
+        state[BLINK_STATE_IN_PROGRESS] = 1.0
+        state[BLINK_STATE_START_TIME] = current_time
+        state[BLINK_STATE_MAX_DROP] = ear_drop_percentage
+        return BLINK_STATUS_START, baseline_ear, ear_drop_percentage, 0.0, 0.0, adaptive_threshold
     
     # Track maximum drop and validate blink completion
-    elif blink_in_progress:
-        if ear_drop_percentage > max_drop_percentage:
-            max_drop_percentage = ear_drop_percentage
+    elif state[BLINK_STATE_IN_PROGRESS] != 0.0:
+        if ear_drop_percentage > state[BLINK_STATE_MAX_DROP]:
+            state[BLINK_STATE_MAX_DROP] = ear_drop_percentage
         
-        blink_duration = current_time - blink_start_time
+        max_drop_percentage = state[BLINK_STATE_MAX_DROP]
+        blink_duration = current_time - state[BLINK_STATE_START_TIME]
         
         # End blink when eye recovers or duration exceeds limit
-        if current_ear > current_baseline_ear * BLINK_RECOVERY_THRESHOLD or blink_duration > BLINK_DURATION_MAX:
+        if current_ear > baseline_ear * BLINK_RECOVERY_THRESHOLD or blink_duration > BLINK_DURATION_MAX:
             # Only register as valid blink if both percentage and absolute drop thresholds are met
-            if (BLINK_DURATION_MIN <= blink_duration <= BLINK_DURATION_MAX and 
+            if (BLINK_DURATION_MIN <= blink_duration <= BLINK_DURATION_MAX and
                 max_drop_percentage > adaptive_threshold and
-                (current_baseline_ear * max_drop_percentage) > BLINK_MIN_ABSOLUTE_EAR_DROP):
-                if (current_time - last_blink_time) > BLINK_COOLDOWN:
-                    last_blink_time = current_time
-                    blink_in_progress = False
+                (baseline_ear * max_drop_percentage) > BLINK_MIN_ABSOLUTE_EAR_DROP):
+                if (current_time - state[BLINK_STATE_LAST_BLINK_TIME]) > BLINK_COOLDOWN:
+                    state[BLINK_STATE_LAST_BLINK_TIME] = current_time
+                    state[BLINK_STATE_IN_PROGRESS] = 0.0
                     
                     # Calculate the actual EAR value at maximum drop for accurate reporting
-                    max_drop_ear = current_baseline_ear * (1 - max_drop_percentage)
-                    
-                    return True, {
-                        "baseline": current_baseline_ear,
-                        "drop": max_drop_percentage,
-                        "max_drop_ear": max_drop_ear,
-                        "duration": blink_duration,
-                        "phase": "complete",
-                        "threshold": adaptive_threshold
-                    }
+                    max_drop_ear = baseline_ear * (1 - max_drop_percentage)
+                    return BLINK_STATUS_COMPLETE, baseline_ear, max_drop_percentage, max_drop_ear, blink_duration, adaptive_threshold
             
-            blink_in_progress = False
-            max_drop_percentage = 0.0
+            state[BLINK_STATE_IN_PROGRESS] = 0.0
+            state[BLINK_STATE_MAX_DROP] = 0.0
     
-    return False, {"baseline": current_baseline_ear, "drop": ear_drop_percentage, "phase": "monitoring", "threshold": adaptive_threshold}
+    return BLINK_STATUS_MONITORING, baseline_ear, ear_drop_percentage, 0.0, 0.0, adaptive_threshold
+
+def detect_blink_advanced(current_ear, current_time):
+    status, baseline_ear, drop, max_drop_ear, blink_duration, adaptive_threshold = _blink_step_numba(
+        current_ear, current_time, _blink_state, _ear_ring, _ear_ring_pos,
+        _PARTIAL_WEIGHTS, _PARTIAL_WEIGHT_SUMS, _ROLLED_WEIGHTS, _WEIGHTS_SUM, baseline_smoothing_factor)
+    
+    if status == BLINK_STATUS_NONE:
+        return False, None
+    
+    if status == BLINK_STATUS_COMPLETE:
+        return True, {
+            "baseline": baseline_ear,
+            "drop": drop,
+            "max_drop_ear": max_drop_ear,
+            "duration": blink_duration,
+            "phase": "complete",
+            "threshold": adaptive_threshold
+        }
+    
+    phase = "start" if status == BLINK_STATUS_START else "monitoring"
+    return False, {"baseline": baseline_ear, "drop": drop, "phase": phase, "threshold": adaptive_threshold}
+
+def warmup_blink_kernel():
+    # Compile against scratch state so the live detector state is untouched
+    _blink_step_numba(0.3, 0.0, np.zeros_like(_blink_state), np.zeros_like(_ear_ring), np.zeros_like(_ear_ring_pos),
+                      _PARTIAL_WEIGHTS, _PARTIAL_WEIGHT_SUMS, _ROLLED_WEIGHTS, _WEIGHTS_SUM, baseline_smoothing_factor)
 
 def reset_blink_detection():
-    global baseline_ear_values, current_baseline_ear, blink_in_progress, blink_start_time, last_blink_time, baseline_smoothing_factor, max_drop_percentage
-    baseline_ear_values.clear()
-    current_baseline_ear = 0.0
-    blink_in_progress = False
-    blink_start_time = 0.0
-    last_blink_time = 0.0
+    global baseline_smoothing_factor
+    _ear_ring_pos[:] = 0
+    _blink_state[:] = 0.0
     baseline_smoothing_factor = 0.3
-    max_drop_percentage = 0.0
+
+def detect_faces_dnn(face_net, frame):
+    frame_height, frame_width = frame.shape[:2]
+    blob = cv2.dnn.blobFromImage(frame, 1.0, FACE_DNN_INPUT_SIZE, FACE_DNN_MEAN)
+    face_net.setInput(blob)
+    detections = face_net.forward()[0, 0]
+    
+    # Convert to dlib rectangles so the landmark predictor API is unchanged
+    faces = []
+    for x1, y1, x2, y2 in detections[detections[:, 2] > FACE_DNN_CONFIDENCE, 3:7]:
+        left = max(0, int(x1 * frame_width))
+        top = max(0, int(y1 * frame_height))
+        right = min(frame_width - 1, int(x2 * frame_width))
+        bottom = min(frame_height - 1, int(y2 * frame_height))
+        if right > left and bottom > top:
+            faces.append(dlib.rectangle(left, top, right, bottom))
+    return faces
+
+def load_face_detector(models_dir):
+    # Returns a detect(frame, gray) callable producing a list of dlib rectangles
+    prototxt_path = os.path.join(models_dir, FACE_DNN_PROTOTXT)
+    model_path = os.path.join(models_dir, FACE_DNN_MODEL)
+    
+    if os.path.exists(prototxt_path) and os.path.exists(model_path):
+        face_net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+        face_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        face_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        
+        def detect(frame, gray):
+            return detect_faces_dnn(face_net, frame)
+        
+        if DEBUG:
+            _emit({"debug": "Using OpenCV DNN face detector"})
+        return detect
+    
+    hog_detector = dlib.get_frontal_face_detector()
+    
+    def detect(frame, gray):
+        return list(hog_detector(gray, 0))
+    
+    if DEBUG:
+        _emit({"debug": "DNN face model not found, using dlib HOG face detector"})
+    return detect
+
+def reset_face_tracking():
+    global _last_faces, _face_eye_offsets, _frames_since_detect
+    _last_faces = []
+    _face_eye_offsets = []
+    _frames_since_detect = 0
+
+# Set once the background warm-up has compiled the kernels and exercised the models
+_warm_event = threading.Event()
+
+def warmup_models(detect_faces, predictor):
+    # Runs during standby so camera activation never pays JIT compilation or
+    # first-call model costs; compiled kernels are also cached to disk
+    try:
+        warmup_ear_kernel()
+        warmup_blink_kernel()
+        
+        width, height = processing_resolution
+        blank_frame = np.zeros((height, width, 3), dtype=np.uint8)
+        blank_gray = np.zeros((height, width), dtype=np.uint8)
+        detect_faces(blank_frame, blank_gray)
+        predictor(blank_gray, dlib.rectangle(0, 0, width - 1, height - 1))
+    except Exception as e:
+        # Surface the failure now rather than on the first live frame
+        _emit({"error": f"Warm-up failed: {str(e)}"}, flush=True)
+    else:
+        _emit({"status": "warm"}, flush=True)
+    finally:
+        _warm_event.set()
+
+def reset_face_data_emission():
+    global _last_emitted_face_detected, _last_emitted_blink, _last_emitted_phase, _last_face_data_time
+    _last_emitted_face_detected = False
+    _last_emitted_blink = False
+    _last_emitted_phase = None
+    _last_face_data_time = 0.0
+
+def should_emit_face_data(face_data, face_center, current_time):
+    global _last_emitted_face_detected, _last_emitted_ear, _last_emitted_center, _last_emitted_blink, _last_emitted_phase, _last_face_data_time
+    
+    face_detected = face_data["faceDetected"]
+    blink = face_data["blink"]
+    phase = face_data.get("blink_phase")
+    
+    changed = (blink or
+               face_detected != _last_emitted_face_detected or
+               blink != _last_emitted_blink or
+               phase != _last_emitted_phase or
+               current_time - _last_face_data_time >= FACE_DATA_MAX_INTERVAL)
+    if face_detected and not changed:
+        changed = (abs(face_data["ear"] - _last_emitted_ear) >= FACE_DATA_EAR_EPSILON or
+                   abs(face_center[0] - _last_emitted_center[0]) >= FACE_DATA_CENTER_EPSILON or
+                   abs(face_center[1] - _last_emitted_center[1]) >= FACE_DATA_CENTER_EPSILON)
+    
+    if not changed:
+        return False
+    
+    _last_emitted_face_detected = face_detected
+    _last_emitted_ear = face_data["ear"]
+    _last_emitted_center = face_center
+    _last_emitted_blink = blink
+    _last_emitted_phase = phase
+    _last_face_data_time = current_time
+    return True
+
+def recenter_face_rect(face, center_x, center_y):
+    left = int(round(center_x - face.width() * 0.5))
+    top = int(round(center_y - face.height() * 0.5))
+    return dlib.rectangle(left, top, left + face.width() - 1, top + face.height() - 1)
 
 def find_available_camera():
-    print(json.dumps({"debug": "Starting camera detection..."}))
-    sys.stdout.flush()
+    if DEBUG:
+        _emit({"debug": "Starting camera detection..."})
     
     # Platform-specific backends for maximum compatibility
     if sys.platform == "win32":
@@ -225,12 +526,12 @@ def find_available_camera():
         backends = [cv2.CAP_V4L2, cv2.CAP_ANY]
     
     for backend in backends:
-        print(json.dumps({"debug": f"Testing backend: {backend}"}))
-        sys.stdout.flush()
+        if DEBUG:
+            _emit({"debug": f"Testing backend: {backend}"})
         
         for i in range(5):
-            print(json.dumps({"debug": f"Trying camera index {i} with backend {backend}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Trying camera index {i} with backend {backend}"})
             
             try:
                 cap_test = cv2.VideoCapture(i, backend)
@@ -239,52 +540,61 @@ def find_available_camera():
                     cap_test.release()
                     
                     if ret and test_frame is not None:
-                        print(json.dumps({"debug": f"Success! Camera {i} working with backend {backend}"}))
-                        print(json.dumps({"status": f"Found working camera at index {i}"}))
-                        sys.stdout.flush()
+                        if DEBUG:
+                            _emit({"debug": f"Success! Camera {i} working with backend {backend}"})
+                        _emit({"status": f"Found working camera at index {i}"}, flush=True)
                         return i, backend
-                    else:
-                        print(json.dumps({"debug": f"Camera {i} opened but cannot read frames"}))
-                        sys.stdout.flush()
-                else:
-                    print(json.dumps({"debug": f"Failed to open camera {i} with backend {backend}"}))
-                    sys.stdout.flush()
+                    elif DEBUG:
+                        _emit({"debug": f"Camera {i} opened but cannot read frames"})
+                elif DEBUG:
+                    _emit({"debug": f"Failed to open camera {i} with backend {backend}"})
             except Exception as e:
-                print(json.dumps({"debug": f"Exception testing camera {i} with backend {backend}: {str(e)}"}))
-                sys.stdout.flush()
+                if DEBUG:
+                    _emit({"debug": f"Exception testing camera {i} with backend {backend}: {str(e)}"})
     
-    print(json.dumps({"debug": "No working camera found after trying all options"}))
-    sys.stdout.flush()
+    if DEBUG:
+        _emit({"debug": "No working camera found after trying all options"})
     return None, None
 
+def configure_capture_resolution():
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, processing_resolution[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, processing_resolution[1])
+    
+    actual_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+    actual_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    if DEBUG:
+        _emit({"debug": f"Camera resolution set to: {actual_width}x{actual_height}"})
+    
+    if DEBUG and (int(actual_width), int(actual_height)) != processing_resolution:
+        _emit({"debug": f"Camera ignored requested resolution {processing_resolution}, frames will be resized"})
+
 def start_camera():
     global cap, CAMERA_ACTIVE
     
-    print(json.dumps({"debug": "start_camera() called"}))
-    sys.stdout.flush()
+    if DEBUG:
+        _emit({"debug": "start_camera() called"})
     
     if CAMERA_ACTIVE:
-        print(json.dumps({"debug": "Camera already active"}))
-        sys.stdout.flush()
+        if DEBUG:
+            _emit({"debug": "Camera already active"})
         return True
     
     # Retry logic for robust camera initialization
     max_retries = 10  
     retry_delay = 2   
     for attempt in range(max_retries):
-        print(json.dumps({"debug": f"Camera start attempt {attempt + 1}/{max_retries}"}))
-        sys.stdout.flush()
+        if DEBUG:
+            _emit({"debug": f"Camera start attempt {attempt + 1}/{max_retries}"})
         
         camera_index, backend = find_available_camera()
         if camera_index is None:
-            print(json.dumps({"debug": f"No working camera found on attempt {attempt + 1}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"No working camera found on attempt {attempt + 1}"})
             if attempt < max_retries - 1:
                 time.sleep(retry_delay)
                 continue
             else:
-                print(json.dumps({"error": "No working camera found after all attempts"}))
-                sys.stdout.flush()
+                _emit({"error": "No working camera found after all attempts"}, flush=True)
                 return False
         
         try:
@@ -292,39 +602,40 @@ def start_camera():
             
             ret, test_frame = cap.read()
             if not ret or test_frame is None:
-                print(json.dumps({"debug": f"Camera opened but cannot read frames on attempt {attempt + 1}"}))
-                sys.stdout.flush()
+                if DEBUG:
+                    _emit({"debug": f"Camera opened but cannot read frames on attempt {attempt + 1}"})
                 cap.release()
                 cap = None
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay)
                     continue
                 else:
-                    print(json.dumps({"error": "Camera opened but cannot read frames after all attempts"}))
-                    sys.stdout.flush()
+                    _emit({"error": "Camera opened but cannot read frames after all attempts"}, flush=True)
                     return False
             
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, processing_resolution[0])
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, processing_resolution[1])
+            # Keep only the newest frame in the driver queue so detection never
+            # works on stale frames; backends without it return False from set()
+            if not cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) and DEBUG:
+                _emit({"debug": "Camera backend does not support setting the buffer size"})
+            
             cap.set(cv2.CAP_PROP_FPS, target_fps)
+            configure_capture_resolution()
             
-            actual_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-            actual_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-            actual_fps = cap.get(cv2.CAP_PROP_FPS)
-            print(json.dumps({"debug": f"Camera resolution set to: {actual_width}x{actual_height}, FPS: {actual_fps}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Camera FPS set to: {cap.get(cv2.CAP_PROP_FPS)}"})
             
             CAMERA_ACTIVE = True
-            print(json.dumps({"status": "Camera opened successfully"}))
-            sys.stdout.flush()
+            _emit({"status": "Camera opened successfully"}, flush=True)
             
             reset_blink_detection()
+            reset_face_tracking()
+            reset_face_data_emission()
             
             return True
             
         except Exception as e:
-            print(json.dumps({"debug": f"Exception starting camera on attempt {attempt + 1}: {str(e)}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Exception starting camera on attempt {attempt + 1}: {str(e)}"})
             if cap is not None:
                 cap.release()
                 cap = None
@@ -333,8 +644,7 @@ def start_camera():
                 time.sleep(retry_delay)
                 continue
             else:
-                print(json.dumps({"error": f"Failed to start camera after all attempts: {str(e)}"}))
-                sys.stdout.flush()
+                _emit({"error": f"Failed to start camera after all attempts: {str(e)}"}, flush=True)
                 return False
     
     return False
@@ -342,31 +652,30 @@ def start_camera():
 def stop_camera():
     global cap, CAMERA_ACTIVE
     
-    print(json.dumps({"debug": "stop_camera() called"}))
-    sys.stdout.flush()
+    if DEBUG:
+        _emit({"debug": "stop_camera() called"})
     
     if cap is not None:
         cap.release()
         cap = None
     
     CAMERA_ACTIVE = False
-    print(json.dumps({"status": "Camera released"}))
-    sys.stdout.flush()
+    _emit({"status": "Camera released"}, flush=True)
 
 def input_thread():
-    print(json.dumps({"debug": "Input thread started"}))
-    sys.stdout.flush()
+    if DEBUG:
+        _emit({"debug": "Input thread started"})
     
     while True:
         try:
             line = sys.stdin.readline()
             if line:
                 command_queue.put(line.strip())
-                print(json.dumps({"debug": f"Received command: {line.strip()}"}))
-                sys.stdout.flush()
+                if DEBUG:
+                    _emit({"debug": f"Received command: {line.strip()}"})
         except Exception as e:
-            print(json.dumps({"debug": f"Input thread error: {str(e)}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Input thread error: {str(e)}"})
             break
 
 def process_commands():
@@ -377,67 +686,76 @@ def process_commands():
             line = command_queue.get_nowait()
             data = json.loads(line)
             
-            print(json.dumps({"debug": f"Processing command: {data}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Processing command: {data}"})
             
             if 'target_fps' in data:
                 target_fps = int(data['target_fps'])
                 if CAMERA_ACTIVE and cap is not None:
                     cap.set(cv2.CAP_PROP_FPS, target_fps)
-                print(json.dumps({"status": f"Updated target FPS to {target_fps}"}))
-                sys.stdout.flush()
+                _emit({"status": f"Updated target FPS to {target_fps}"}, flush=True)
             elif 'processing_resolution' in data:
                 processing_resolution = tuple(data['processing_resolution'])
-                print(json.dumps({"status": f"Updated processing resolution to {processing_resolution}"}))
-                sys.stdout.flush()
+                buffers.allocate_frame_buffers(processing_resolution)
+                if CAMERA_ACTIVE and cap is not None:
+                    configure_capture_resolution()
+                _emit({"status": f"Updated processing resolution to {processing_resolution}"}, flush=True)
             elif 'request_video' in data:
                 SEND_VIDEO = True
-                print(json.dumps({"status": "Video streaming enabled"}))
-                sys.stdout.flush()
+                _emit({"status": "Video streaming enabled"}, flush=True)
             elif 'start_camera' in data:
                 if start_camera():
-                    print(json.dumps({"status": "Camera started successfully"}))
+                    _emit({"status": "Camera started successfully"}, flush=True)
                 else:
-                    print(json.dumps({"error": "Failed to start camera"}))
-                sys.stdout.flush()
+                    _emit({"error": "Failed to start camera"}, flush=True)
             elif 'stop_camera' in data:
                 stop_camera()
                 SEND_VIDEO = False
-                print(json.dumps({"status": "Camera stopped"}))
-                sys.stdout.flush()
+                _emit({"status": "Camera stopped"}, flush=True)
         except json.JSONDecodeError as e:
-            print(json.dumps({"debug": f"JSON decode error: {str(e)}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"JSON decode error: {str(e)}"})
         except Exception as e:
-            print(json.dumps({"debug": f"Command processing error: {str(e)}"}))
-            sys.stdout.flush()
+            if DEBUG:
+                _emit({"debug": f"Command processing error: {str(e)}"})
 
 def main():
-    global SEND_VIDEO, CAMERA_ACTIVE, cap, last_blink_display_time
+    global SEND_VIDEO, CAMERA_ACTIVE, cap, buffers, last_blink_display_time, _last_faces, _face_eye_offsets, _frames_since_detect
     
-    print(json.dumps({"status": "Starting blink detector in standby mode..."}))
-    sys.stdout.flush()
+    configure_stdout()
+    output_writer = threading.Thread(target=output_writer_thread, daemon=True)
+    output_writer.start()
+    video_encoder = threading.Thread(target=video_encoder_thread, daemon=True)
+    video_encoder.start()
     
-    detector = dlib.get_frontal_face_detector()
+    _emit({"status": "Starting blink detector in standby mode..."}, flush=True)
     
     # Model path handling for both development and bundled scenarios
     if getattr(sys, 'frozen', False):
         base_path = sys._MEIPASS
-        predictor_path = os.path.join(base_path, 'assets', 'models', 'shape_predictor_68_face_landmarks.dat')
+        models_dir = os.path.join(base_path, 'assets', 'models')
     else:
         app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        predictor_path = os.path.join(app_root, 'electron', 'assets', 'models', 'shape_predictor_68_face_landmarks.dat')
+        models_dir = os.path.join(app_root, 'electron', 'assets', 'models')
+    predictor_path = os.path.join(models_dir, 'shape_predictor_68_face_landmarks.dat')
+    
+    detect_faces = load_face_detector(models_dir)
     
     if not os.path.exists(predictor_path):
-        print(json.dumps({"error": f"Facial landmark model not found at: {predictor_path}"}))
+        _emit({"error": f"Facial landmark model not found at: {predictor_path}"}, flush=True)
+        close_output(output_writer)
         sys.exit(1)
     
     predictor = dlib.shape_predictor(predictor_path)
     buffers = PreallocatedBuffers()
+    buffers.allocate_frame_buffers(processing_resolution)
+    
+    warmup_thread = threading.Thread(target=warmup_models, args=(detect_faces, predictor), daemon=True)
+    warmup_thread.start()
     
-    print(json.dumps({"status": "Models loaded successfully, ready for camera activation"}))
-    print(json.dumps({"debug": "Advanced blink detection with dynamic baseline is active"}))
-    sys.stdout.flush()
+    _emit({"status": "Models loaded successfully, ready for camera activation"}, flush=True)
+    if DEBUG:
+        _emit({"debug": "Advanced blink detection with dynamic baseline is active"})
     
     last_blink_time = time.time()
     frame_count = 0
@@ -459,68 +777,99 @@ def main():
     input_handler.start()
     
     try:
-        while True:
+        while not _output_closed.is_set():
             process_commands()
             
             if not CAMERA_ACTIVE or cap is None:
                 time.sleep(0.1)
                 continue
             
-            # Frame rate limiting for consistent processing
+            # Models must not be used concurrently with the warm-up thread
+            if not _warm_event.is_set():
+                _warm_event.wait()
+            
+            # Frame rate limiting: sleep once to just short of the next deadline
+            # instead of waking every millisecond, then spin out the remainder
             current_time = time.time()
-            if current_time - last_frame_time < frame_interval:
-                time.sleep(0.001)
+            sleep_for = frame_interval - (current_time - last_frame_time)
+            if sleep_for > 0:
+                if sleep_for > 0.002:
+                    time.sleep(sleep_for - 0.0005)
                 continue
             
             last_frame_time = current_time
             
             ret, frame = cap.read()
             if not ret:
-                print(json.dumps({"error": "Failed to read frame"}))
+                _emit({"error": "Failed to read frame"}, flush=True)
                 time.sleep(0.1)
                 continue
             
-            current_shape = frame.shape[:2]
-            target_shape = processing_resolution[::-1]
-            if current_shape != target_shape:
-                frame = cv2.resize(frame, processing_resolution)
+            # Decide on the delivered frame, not the size the driver reports; some
+            # backends acknowledge the requested resolution and ignore it
+            if frame.shape[:2] != processing_resolution[::-1]:
+                # INTER_AREA is both faster and cleaner than INTER_LINEAR for downscaling
+                interpolation = cv2.INTER_AREA if frame.shape[1] > processing_resolution[0] else cv2.INTER_LINEAR
+                frame = cv2.resize(frame, processing_resolution, dst=buffers.temp_frame, interpolation=interpolation)
             
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # The green channel is a close enough luminance proxy for face and
+            # landmark detection and reads a third of the bytes of a full conversion
+            gray = cv2.extractChannel(frame, 1, dst=buffers.gray)
             
-            faces = detector(gray, 0)
-            last_face_detection_time = current_time
+            # Reuse the previous detections on intermediate frames; an empty
+            # result forces a fresh detection on the next frame
+            if _frames_since_detect % DETECT_EVERY == 0 or not _last_faces:
+                _last_faces = detect_faces(frame, gray)
+                _face_eye_offsets = [None] * len(_last_faces)
+                _frames_since_detect = 0
+                last_face_detection_time = current_time
+            _frames_since_detect += 1
+            faces = _last_faces
             
             face_data = default_face_data.copy()
+            face_center = (0.0, 0.0)
+            
+            # Normalize by multiplying with reciprocals computed once per frame
+            inv_width = 1.0 / frame.shape[1]
+            inv_height = 1.0 / frame.shape[0]
+            buffers.landmark_scale[0] = inv_width
+            buffers.landmark_scale[1] = inv_height
             
-            for face in faces:
-                left_eye, right_eye = get_eye_landmarks_only(predictor, gray, face, buffers)
+            for face_index, face in enumerate(faces):
+                both_eyes = get_eye_landmarks_only(predictor, gray, face, buffers)
                 
-                left_ear = calculate_ear_fast(left_eye, buffers)
-                right_ear = calculate_ear_fast(right_eye, buffers)
+                left_ear, right_ear = calculate_ear_pair(both_eyes)
                 avg_ear = (left_ear + right_ear) * 0.5
                 
-                frame_width = frame.shape[1]
-                frame_height = frame.shape[0]
-                
                 face_data["faceDetected"] = True
                 face_data["ear"] = float(avg_ear)
                 face_data["faceRect"] = {
-                    "x": float(face.left() / frame_width),
-                    "y": float(face.top() / frame_height),
-                    "width": float(face.width() / frame_width),
-                    "height": float(face.height() / frame_height)
+                    "x": face.left() * inv_width,
+                    "y": face.top() * inv_height,
+                    "width": face.width() * inv_width,
+                    "height": face.height() * inv_height
                 }
                 
-                buffers.concatenated_eyes[:6] = left_eye
-                buffers.concatenated_eyes[6:] = right_eye
+                eye_points = both_eyes.reshape(12, 2)
+                face_point = face.center()
+                face_center = (face_point.x, face_point.y)
                 
-                for i in range(12):
-                    buffers.normalized_landmarks[i]["x"] = float(buffers.concatenated_eyes[i, 0] / frame_width)
-                    buffers.normalized_landmarks[i]["y"] = float(buffers.concatenated_eyes[i, 1] / frame_height)
+                # Keep the cached rectangle centred on the eyes so it follows
+                # head motion until the next full detection
+                eye_center_x, eye_center_y = eye_points.mean(axis=0)
+                if _face_eye_offsets[face_index] is None:
+                    _face_eye_offsets[face_index] = (face_point.x - eye_center_x, face_point.y - eye_center_y)
+                else:
+                    offset_x, offset_y = _face_eye_offsets[face_index]
+                    _last_faces[face_index] = recenter_face_rect(face, eye_center_x + offset_x, eye_center_y + offset_y)
                 
-                face_data["eyeLandmarks"] = buffers.normalized_landmarks.copy()
+                # tolist() hands the payload its own Python floats, so reusing
+                # norm_xy on the next frame can't alter an already built message
+                np.multiply(eye_points, buffers.landmark_scale, out=buffers.norm_xy)
+                face_data["eyeLandmarks"] = [{"x": x, "y": y} for x, y in buffers.norm_xy.tolist()]
                 
                 blink_detected, blink_info = detect_blink_advanced(avg_ear, current_time)
+                current_baseline_ear = float(_blink_state[BLINK_STATE_BASELINE])
                 
                 # Simplified blink state management to prevent visual flicker
                 if blink_detected and blink_info:
@@ -530,18 +879,18 @@ def main():
                     # Use the EAR value at maximum drop for more accurate reporting
                     max_drop_ear = blink_info.get("max_drop_ear", avg_ear)
                     
-                    print(json.dumps({
+                    _emit({
                         "blink": True,
                         "ear": float(max_drop_ear), 
                         "baseline": float(blink_info["baseline"]),
                         "drop_percentage": float(blink_info["drop"]),
                         "duration": float(blink_info["duration"]),
                         "time": float(current_time)
-                    }))
-                    print(json.dumps({
-                        "debug": f"Blink detected! Max Drop EAR: {max_drop_ear:.3f}, Baseline: {blink_info['baseline']:.3f}, Drop: {blink_info['drop']:.1%}, Duration: {blink_info['duration']:.3f}s, Absolute Drop: {blink_info['baseline'] - max_drop_ear:.3f}"
-                    }))
-                    sys.stdout.flush()
+                    }, flush=True)
+                    if DEBUG:
+                        _emit({
+                            "debug": f"Blink detected! Max Drop EAR: {max_drop_ear:.3f}, Baseline: {blink_info['baseline']:.3f}, Drop: {blink_info['drop']:.1%}, Duration: {blink_info['duration']:.3f}s, Absolute Drop: {blink_info['baseline'] - max_drop_ear:.3f}"
+                        })
                 elif (current_time - last_blink_display_time) < BLINK_DISPLAY_DURATION:
                     face_data["blink"] = True
                 
@@ -559,30 +908,28 @@ def main():
                 elif current_baseline_ear == 0:
                     face_data["blink_phase"] = "initializing"
             
-            if face_data.get("faceDetected", False):
-                print(json.dumps({"faceData": face_data}))
-            else:
-                print(_cached_json_strings["no_face_data"])
-            sys.stdout.flush()
+            if should_emit_face_data(face_data, face_center, current_time):
+                if face_data["faceDetected"]:
+                    _emit({"faceData": face_data})
+                elif not _output_closed.is_set():
+                    _out_q.put((_cached_json_strings["no_face_data"], False))
             
             # Stream video for visualization when requested
-            if SEND_VIDEO and face_data.get("faceDetected", False):
-                if processing_resolution == (640, 480):
-                    frame_base64 = encode_frame(frame)
-                else:
-                    display_frame = cv2.resize(frame, (640, 480))
-                    frame_base64 = encode_frame(display_frame)
-                
-                print(json.dumps({"videoStream": frame_base64}))
-                sys.stdout.flush()
+            if SEND_VIDEO and face_data.get("faceDetected", False) and frame_count % VIDEO_STREAM_EVERY == 0:
+                # Encoding happens on the video thread; the copy keeps the frame
+                # safe from the reused resize buffer
+                try:
+                    _video_q.put_nowait(frame.copy())
+                except queue.Full:
+                    pass
             
             frame_count += 1
             
     except KeyboardInterrupt:
-        print(json.dumps({"status": "Stopping blink detector..."}))
-        sys.stdout.flush()
+        _emit({"status": "Stopping blink detector..."}, flush=True)
     finally:
         stop_camera()
+        close_output(output_writer)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
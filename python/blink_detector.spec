@@ -1,37 +1,83 @@
 # -*- mode: python ; coding: utf-8 -*-
+import argparse
+import sys
+
+# SPECPATH is set by PyInstaller to this file's directory
+sys.path.insert(0, SPECPATH)
+from build_binary import EXCLUDED_MODULES
+
+# Options passed after "--" on the pyinstaller command line
+parser = argparse.ArgumentParser()
+parser.add_argument('--mode', choices=('onedir', 'onefile'), default='onedir')
+parser.add_argument('--models', default='../electron/assets/models')
+parser.add_argument('--noupx', action='store_true')
+options = parser.parse_args()
+
+# UPX breaks signed macOS binaries. Binaries are never stripped: that corrupts
+# the libraries bundled in manylinux wheels (e.g. NumPy's OpenBLAS)
+upx = sys.platform != 'darwin' and not options.noupx
 
 a = Analysis(
     ['blink_detector.py'],
     pathex=[],
     binaries=[],
-    datas=[('../electron/assets/models', 'assets/models')],
+    datas=[(options.models, 'assets/models')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=list(EXCLUDED_MODULES),
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='blink_detector',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=True,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
+if options.mode == 'onefile':
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='blink_detector',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=upx,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=True,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='blink_detector',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=upx,
+        console=True,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        contents_directory='_internal',
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=upx,
+        upx_exclude=[],
+        name='blink_detector',
+    )
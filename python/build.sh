@@ -22,7 +22,7 @@ source "$SCRIPT_DIR/venv/bin/activate"
 
 # Install PyInstaller if not already installed
 echo "🔧 Checking PyInstaller installation..."
-python -c "import PyInstaller" 2>/dev/null || {
+python -c "import importlib.util, sys; sys.exit(importlib.util.find_spec('PyInstaller') is None)" || {
     echo "📦 Installing PyInstaller..."
     pip install pyinstaller
 }
@@ -32,7 +32,7 @@ echo OK: Virtual environment activated successfully
 
 REM Install PyInstaller if not already installed
 echo Checking PyInstaller installation...
-python -c "import PyInstaller" 2>nul || (
+python -c "import importlib.util, sys; sys.exit(importlib.util.find_spec('PyInstaller') is None)" || (
     echo Installing PyInstaller...
     pip install pyinstaller
 )
@@ -50,7 +50,7 @@ echo Building binary...
 python "%SCRIPT_DIR%build_binary.py"
 
 REM Check if build was successful
-if not exist "%SCRIPT_DIR%dist\blink_detector.exe" (
+if not exist "%SCRIPT_DIR%dist\blink_detector\blink_detector.exe" (
     echo ERROR: Binary build failed! Checking for errors...
     echo.
     echo Checking dist directory contents:
@@ -61,8 +61,8 @@ if not exist "%SCRIPT_DIR%dist\blink_detector.exe" (
     )
     echo.
     echo Checking build directory contents:
-    if exist "%SCRIPT_DIR%build" (
-        dir "%SCRIPT_DIR%build"
+    if exist "%SCRIPT_DIR%build-cache" (
+        dir "%SCRIPT_DIR%build-cache"
     ) else (
         echo Build directory does not exist!
     )
@@ -89,8 +89,8 @@ echo.
 echo Your blink detector is now ready for distribution!
 echo.
 echo Summary:
-echo - Standalone binary created: python/dist/blink_detector.exe
-echo - Binary installed to: electron/resources/blink_detector.exe
+echo - Standalone binary created: python/dist/blink_detector/blink_detector.exe
+echo - Binary installed to: electron/resources/blink_detector/blink_detector.exe
 echo - Binary size: ~117MB (includes Python + all dependencies)
 echo.
 echo Next steps:
@@ -101,4 +101,4 @@ echo.
 echo To update your Electron code, change from:
 echo    spawn('python', ['python/blink_detector.py'], ...)
 echo    to:
-echo    spawn(path.join(__dirname, 'resources', 'blink_detector.exe'), [], ...) 
\ No newline at end of file
+echo    spawn(path.join(__dirname, 'resources', 'blink_detector', 'blink_detector.exe'), [], ...) 
\ No newline at end of file
@@ -22,7 +22,7 @@ source "$SCRIPT_DIR/venv/bin/activate"
 
 # Install PyInstaller if not already installed
 echo "🔧 Checking PyInstaller installation..."
-python -c "import PyInstaller" 2>/dev/null || {
+python -c "import importlib.util, sys; sys.exit(importlib.util.find_spec('PyInstaller') is None)" || {
     echo "📦 Installing PyInstaller..."
     pip install pyinstaller
 }
@@ -44,8 +44,8 @@ echo ""
 echo "🎉 Your blink detector is now ready for distribution!"
 echo ""
 echo "📝 Summary:"
-echo "- Standalone binary created: python/dist/blink_detector"
-echo "- Binary installed to: electron/resources/blink_detector"
+echo "- Standalone binary created: python/dist/blink_detector/blink_detector"
+echo "- Binary installed to: electron/resources/blink_detector/blink_detector"
 echo "- Binary size: ~117MB (includes Python + all dependencies)"
 echo ""
 echo "💡 Next steps:"
@@ -56,4 +56,4 @@ echo ""
 echo "🔧 To update your Electron code, change from:"
 echo "   spawn('python', ['python/blink_detector.py'], ...)"
 echo "   to:"
-echo "   spawn(path.join(__dirname, 'resources', 'blink_detector'), [], ...)" 
\ No newline at end of file
+echo "   spawn(path.join(__dirname, 'resources', 'blink_detector', 'blink_detector'), [], ...)" 
\ No newline at end of file
@@ -8,30 +8,135 @@ import sys
 import subprocess
 import shutil
 import platform
+import argparse
+import json
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
 from pathlib import Path
 
+from file_copy import reflink
+
+# Resolved once; none of these change while the script runs
+_SYSTEM = platform.system()
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_EXE_SUFFIX = ".exe" if _SYSTEM == "Windows" else ""
+
+# PyInstaller work directory, kept between builds so unchanged work is reused
+BUILD_CACHE_DIR = "build-cache"
+# Lines of PyInstaller output kept for the failure report
+LOG_TAIL_LINES = 200
+# onedir skips the per-launch unpacking of a onefile archive; onefile remains for single-file distribution
+BUILD_MODES = ("onedir", "onefile")
+# Folder next to the onedir executable that holds the bundled libraries and data
+CONTENTS_DIRECTORY = "_internal"
+# Architectures PyInstaller can target from a macOS host (passed as --target-arch)
+MACOS_TARGET_ARCHES = ("x86_64", "arm64", "universal2")
+# Stdlib and third-party modules blink_detector never imports; blink_detector.spec imports this list too
+EXCLUDED_MODULES = (
+    "tkinter",
+    "test",
+    "pydoc",
+    "xml.sax",
+    "http.server",
+    "distutils",
+    "setuptools",
+    "pip",
+    "scipy.spatial.transform.tests",
+    "matplotlib",
+)
+
+# Set once PyInstaller is known to be importable, so repeat calls skip the lookup
+_pyinstaller_ready = False
+
 def install_pyinstaller():
     """Install PyInstaller if not already installed"""
-    try:
-        import PyInstaller
+    global _pyinstaller_ready
+    if _pyinstaller_ready:
+        return
+    # find_spec locates the package without paying for importing it
+    if importlib.util.find_spec("PyInstaller") is not None:
         print("PyInstaller is already installed")
-    except ImportError:
-        print("Installing PyInstaller...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
+    else:
+        print("Installing PyInstaller...", flush=True)
+        subprocess.check_call(
+            [sys.executable, "-m", "pip", "--disable-pip-version-check",
+             "install", "-q", "--no-input", "pyinstaller"],
+            stdin=subprocess.DEVNULL,
+            close_fds=True,
+            env={**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1", "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+    _pyinstaller_ready = True
 
 def get_executable_name():
     """Get the correct executable name for the current platform"""
-    if platform.system() == "Windows":
-        return "blink_detector.exe"
-    elif platform.system() == "Darwin":  # macOS
-        return "blink_detector"
-    else:  # Linux
-        return "blink_detector"
-
-def build_binary():
+    return f"blink_detector{_EXE_SUFFIX}"
+
+def run_pyinstaller(cmd):
+    """Run PyInstaller, streaming its output live and keeping only the tail for error reports"""
+    tail = deque(maxlen=LOG_TAIL_LINES)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    for line in process.stdout:
+        print(line, end="")
+        tail.append(line)
+    
+    returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, output="".join(tail))
+
+def run_pyinstaller_in_process(args):
+    """Run PyInstaller inside this interpreter, returning False if it can't be imported"""
+    try:
+        from PyInstaller import __main__ as pyi_main
+    except ImportError:
+        return False
+    
+    sys.stdout.flush()
+    try:
+        pyi_main.run(args)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            returncode = e.code if isinstance(e.code, int) else 1
+            raise subprocess.CalledProcessError(returncode, ["pyinstaller", *args], output=str(e.code))
+    except Exception as e:
+        raise subprocess.CalledProcessError(1, ["pyinstaller", *args], output=repr(e))
+    return True
+
+def pyinstaller_base_command(fresh=False, workpath=BUILD_CACHE_DIR, distpath="dist"):
+    """PyInstaller invocation; reuses the previous build's analysis unless a fresh build is requested"""
+    cmd = ["pyinstaller", "--noconfirm", f"--workpath=./{workpath}", f"--distpath=./{distpath}"]
+    if fresh:
+        cmd.append("--clean")
+    return cmd
+
+def bundle_mode_flags(mode):
+    """PyInstaller flags selecting a onedir or onefile bundle"""
+    if mode == "onefile":
+        return ["--onefile"]
+    return ["--onedir", f"--contents-directory={CONTENTS_DIRECTORY}"]
+
+def built_executable_path(dist_dir, mode):
+    """Where PyInstaller leaves the executable for the given bundle mode"""
+    if mode == "onefile":
+        return dist_dir / get_executable_name()
+    return dist_dir / "blink_detector" / get_executable_name()
+
+def size_reduction_flags(use_upx=True):
+    """Module exclusions plus the UPX flags that are safe on this platform"""
+    # No --strip: stripping the manylinux wheels' bundled libraries (e.g. NumPy's
+    # OpenBLAS) leaves them unloadable, and it breaks signed macOS binaries
+    flags = [f"--exclude-module={module}" for module in EXCLUDED_MODULES]
+    upx = shutil.which("upx")
+    if not use_upx or _SYSTEM == "Darwin":
+        flags.append("--noupx")
+    elif upx:
+        flags.append(f"--upx-dir={os.path.dirname(upx)}")
+    return flags
+
+def build_binary(fresh=False, use_upx=True, mode="onedir"):
     """Build the standalone binary"""
     # Get the directory of this script
-    script_dir = Path(__file__).parent
+    script_dir = _SCRIPT_DIR
     blink_detector_path = script_dir / "blink_detector.py"
     
     # Ensure the blink detector script exists
@@ -43,10 +148,10 @@ def build_binary():
     dist_dir = script_dir / "dist"
     dist_dir.mkdir(exist_ok=True)
     
-    print("Building standalone binary...")
-    print(f"Platform: {platform.system()} {platform.machine()}")
-    print(f"Script directory: {script_dir}")
-    print(f"Current working directory: {os.getcwd()}")
+    print(f"""Building standalone binary...
+Platform: {_SYSTEM} {platform.machine()}
+Script directory: {script_dir}
+Current working directory: {os.getcwd()}""")
     
     # Check if spec file exists
     spec_file = script_dir / "blink_detector.spec"
@@ -58,41 +163,51 @@ def build_binary():
     print(f"Changed working directory to: {os.getcwd()}")
     
     try:
+        if model_source.exists():
+            model_source = stage_assets(model_source)
+            prefetch_assets(model_source)
+        
         # Try to build with spec file first
         if spec_file.exists():
             print("Using existing spec file...")
             try:
-                cmd = ["pyinstaller", "--clean", "blink_detector.spec"]
+                cmd = pyinstaller_base_command(fresh) + ["blink_detector.spec", "--", f"--mode={mode}"]
+                if not use_upx:
+                    cmd.append("--noupx")
+                if model_source.exists():
+                    cmd.append(f"--models={model_source}")
                 print(f"Command: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                print("PyInstaller output:")
-                print(result.stdout)
-                if result.stderr:
-                    print("PyInstaller stderr:")
-                    print(result.stderr)
+                # In-process saves spawning a second interpreter and re-importing PyInstaller
+                if not run_pyinstaller_in_process(cmd[1:]):
+                    run_pyinstaller(cmd)
             except subprocess.CalledProcessError as e:
-                print(f"Spec file build failed: {e}")
-                print("PyInstaller stderr:")
-                print(e.stderr)
-                print("Falling back to direct PyInstaller command...")
+                print(f"""Spec file build failed: {e}
+PyInstaller output (last {LOG_TAIL_LINES} lines):
+{e.output}
+Falling back to direct PyInstaller command...""")
                 # Fall back to direct command
-                build_with_direct_command(blink_detector_path, model_source)
+                build_with_direct_command(blink_detector_path, model_source, fresh, use_upx, mode)
         else:
             print("Creating new build with PyInstaller...")
-            build_with_direct_command(blink_detector_path, model_source)
+            build_with_direct_command(blink_detector_path, model_source, fresh, use_upx, mode)
         
         # Check if binary was created
-        exe_name = get_executable_name()
-        exe_path = dist_dir / exe_name
+        exe_path = built_executable_path(dist_dir, mode)
         
         if exe_path.exists():
-            size_mb = exe_path.stat().st_size / (1024*1024)
-            print(f"\nSUCCESS: Binary created successfully!")
-            print(f"Location: {exe_path}")
-            print(f"Size: {size_mb:.1f} MB")
+            if mode == "onedir":
+                # The launcher is tiny; report the whole bundle like install_binary does
+                size = sum(f.stat().st_size for f in exe_path.parent.rglob("*") if f.is_file() and not f.is_symlink())
+            else:
+                size = exe_path.stat().st_size
+            size_mb = size / (1024*1024)
+            print(f"""
+SUCCESS: Binary created successfully!
+Location: {exe_path}
+Size: {size_mb:.1f} MB""")
             
             # Test if the binary is executable
-            if platform.system() != "Windows":
+            if _SYSTEM != "Windows":
                 os.chmod(exe_path, 0o755)
                 print("OK: Made binary executable")
         else:
@@ -107,71 +222,192 @@ def build_binary():
         os.chdir(original_cwd)
         print(f"Restored working directory to: {os.getcwd()}")
 
-def build_with_direct_command(blink_detector_path, model_source):
+def build_with_direct_command(blink_detector_path, model_source, fresh=False, use_upx=True, mode="onedir"):
     """Build using direct PyInstaller command"""
     if not model_source.exists():
-        print(f"Warning: Model directory not found at {model_source}")
-        print("Will try to build without models (binary may not work properly)")
-        cmd = [
-            "pyinstaller",
-            "--clean",
-            "--onefile",
+        print(f"""Warning: Model directory not found at {model_source}
+Will try to build without models (binary may not work properly)""")
+        cmd = pyinstaller_base_command(fresh) + size_reduction_flags(use_upx) + bundle_mode_flags(mode) + [
             "--name=blink_detector",
             "blink_detector.py"
         ]
     else:
         # Use relative paths since we're now in the script directory
         relative_model_path = model_source.relative_to(Path.cwd())
-        cmd = [
-            "pyinstaller",
-            "--clean",
-            "--onefile",
+        cmd = pyinstaller_base_command(fresh) + size_reduction_flags(use_upx) + bundle_mode_flags(mode) + [
             "--name=blink_detector",
             f"--add-data={relative_model_path}:assets/models",
             "blink_detector.py"
         ]
     
-    print(f"Command: {' '.join(cmd)}")
+    cmd_line = " ".join(cmd)
+    print(f"Command: {cmd_line}")
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print("PyInstaller output:")
-        print(result.stdout)
-        if result.stderr:
-            print("PyInstaller stderr:")
-            print(result.stderr)
+        run_pyinstaller(cmd)
     except subprocess.CalledProcessError as e:
-        print(f"ERROR: Build failed with error: {e}")
-        print("PyInstaller stderr:")
-        print(e.stderr)
-        print("PyInstaller stdout:")
-        print(e.stdout)
+        print(f"""ERROR: Build failed with exit code {e.returncode}: {cmd_line}
+PyInstaller output (last {LOG_TAIL_LINES} lines):
+{e.output}""")
         sys.exit(1)
 
+def stage_assets(model_source, cache=None):
+    """Clone the model files into the build cache, redoing only those whose source changed"""
+    if cache is None:
+        cache = _SCRIPT_DIR / BUILD_CACHE_DIR / "assets" / "models"
+    cache.mkdir(parents=True, exist_ok=True)
+    # Kept beside the cache dir, not in it, so it isn't bundled with the models
+    stamp_path = cache.parent / "models.stamp.json"
+    try:
+        stamps = json.loads(stamp_path.read_text())
+    except (OSError, ValueError):
+        stamps = {}
+    
+    current = {}
+    for src in model_source.iterdir():
+        if not src.is_file():
+            continue
+        st = src.stat()
+        stamp = [st.st_ino, st.st_size, st.st_mtime_ns]
+        dst = cache / src.name
+        if stamps.get(src.name) != stamp or not dst.exists() or dst.stat().st_size != st.st_size:
+            print(f"Staging {src.name} into {cache}")
+            reflink(src, dst)
+        current[src.name] = stamp
+    
+    for staged in cache.iterdir():
+        if staged.name not in current:
+            staged.unlink()
+    stamp_path.write_text(json.dumps(current))
+    return cache.resolve()
+
+def prefetch_assets(directory):
+    """Ask the kernel to start reading the staged files before PyInstaller hashes and archives them"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in directory.iterdir():
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+def target_command(target, staged_models, fresh=False, use_upx=True, mode="onedir"):
+    """Direct PyInstaller command for one target, with its own dist, work and spec paths"""
+    target_cache = f"{BUILD_CACHE_DIR}/{target}"
+    cmd = pyinstaller_base_command(fresh, workpath=target_cache, distpath=f"dist/{target}")
+    cmd += size_reduction_flags(use_upx)
+    cmd += bundle_mode_flags(mode)
+    cmd += [f"--specpath=./{target_cache}", "--name=blink_detector"]
+    cmd.append(f"--target-arch={target}")
+    if staged_models is not None:
+        cmd.append(f"--add-data={staged_models}:assets/models")
+    cmd.append("blink_detector.py")
+    return cmd
+
+def build_target(target, cmd):
+    """Run one target's PyInstaller build, writing its output to a per-target log"""
+    log_path = Path(BUILD_CACHE_DIR) / f"{target}.log"
+    with open(log_path, "w") as log:
+        returncode = subprocess.call(cmd, stdout=log, stderr=subprocess.STDOUT)
+    return target, returncode, log_path
+
+def build_targets(targets, fresh=False, use_upx=True, mode="onedir"):
+    """Build several macOS architectures concurrently into dist/<arch>, sharing one staged copy of the models"""
+    script_dir = _SCRIPT_DIR
+    model_source = script_dir.parent / "electron" / "assets" / "models"
+    
+    original_cwd = os.getcwd()
+    os.chdir(script_dir)
+    try:
+        Path(BUILD_CACHE_DIR).mkdir(exist_ok=True)
+        
+        staged_models = None
+        if model_source.exists():
+            staged_models = stage_assets(model_source)
+            prefetch_assets(staged_models)
+            print(f"Staged models in {staged_models}")
+        else:
+            print(f"Warning: Model directory not found at {model_source}")
+        
+        failed = []
+        # Workers only wait on PyInstaller subprocesses, so threads are enough to run them in parallel
+        with ThreadPoolExecutor(max_workers=min(len(targets), os.cpu_count() or 1)) as pool:
+            futures = []
+            for target in targets:
+                cmd = target_command(target, staged_models, fresh, use_upx, mode)
+                print(f"[{target}] Command: {' '.join(cmd)}")
+                futures.append(pool.submit(build_target, target, cmd))
+            
+            for future in as_completed(futures):
+                target, returncode, log_path = future.result()
+                if returncode == 0:
+                    exe_path = built_executable_path(Path("dist") / target, mode)
+                    print(f"[{target}] OK: {exe_path} (log: {log_path})")
+                else:
+                    print(f"[{target}] ERROR: PyInstaller exited with {returncode} (log: {log_path})")
+                    failed.append((target, log_path))
+        
+        for target, log_path in failed:
+            with open(log_path) as log:
+                tail = deque(log, maxlen=LOG_TAIL_LINES)
+            print(f"\n[{target}] PyInstaller output (last {LOG_TAIL_LINES} lines):")
+            print("".join(tail), end="")
+        if failed:
+            sys.exit(1)
+    finally:
+        os.chdir(original_cwd)
+
 def create_cross_platform_builds():
     """Create builds for multiple platforms (requires Docker or cross-compilation setup)"""
-    print("\nFor cross-platform builds, you can use:")
-    print("1. Docker with multi-stage builds")
-    print("2. GitHub Actions for automated builds")
-    print("3. Virtual machines for each target platform")
-    print("\nFor now, the binary is built for your current platform only.")
+    print("""
+For cross-platform builds, you can use:
+1. Docker with multi-stage builds
+2. GitHub Actions for automated builds
+3. Virtual machines for each target platform
+
+For now, the binary is built for your current platform only.""")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the standalone blink detector binary")
+    parser.add_argument("--fresh", action="store_true",
+                        help="pass --clean to PyInstaller to discard cached build state (e.g. for release builds)")
+    parser.add_argument("--noupx", action="store_true",
+                        help="do not compress the binary with UPX even if it is installed")
+    parser.add_argument("--mode", choices=BUILD_MODES, default="onedir",
+                        help="onedir (default) starts faster; onefile produces a single executable, "
+                             "e.g. for signed macOS distribution")
+    parser.add_argument("--targets", nargs="+", choices=MACOS_TARGET_ARCHES, metavar="ARCH",
+                        help="macOS only: build each architecture "
+                             f"({', '.join(MACOS_TARGET_ARCHES)}) in parallel into dist/<arch>; "
+                             "other platforms can only build for the host architecture")
+    args = parser.parse_args()
+    if args.targets and _SYSTEM != "Darwin":
+        parser.error(f"--targets needs a macOS host; on {_SYSTEM} every target would be the same host-arch build")
+    return args
 
 def main():
+    args = parse_args()
     print("Building blink detector standalone binary...")
     
     # Install PyInstaller if needed
     install_pyinstaller()
     
     # Build the binary
-    build_binary()
+    if args.targets:
+        build_targets(list(dict.fromkeys(args.targets)), fresh=args.fresh, use_upx=not args.noupx, mode=args.mode)
+    else:
+        build_binary(fresh=args.fresh, use_upx=not args.noupx, mode=args.mode)
     
     # Show cross-platform build info
     create_cross_platform_builds()
     
-    print("\nSUCCESS: Build complete! You can now distribute the binary with your Electron app.")
-    print("\nNext steps:")
-    print("1. Copy the binary to your Electron app's resources folder")
-    print("2. Update your Electron code to spawn the binary instead of Python script")
-    print("3. Test the binary on a clean machine without Python installed")
+    print("""
+SUCCESS: Build complete! You can now distribute the binary with your Electron app.
+
+Next steps:
+1. Copy the binary to your Electron app's resources folder
+2. Update your Electron code to spawn the binary instead of Python script
+3. Test the binary on a clean machine without Python installed""")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
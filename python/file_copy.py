@@ -0,0 +1,195 @@
+"""
+Copy-on-write and in-kernel file copy helpers shared by the build and install scripts
+"""
+
+import os
+import shutil
+import sys
+
+# Bytes handed to each copy_file_range/sendfile call
+FAST_COPY_CHUNK = 4 * 1024 * 1024
+# Linux ioctl that makes dst share src's extents (Btrfs, XFS with reflink, bcachefs)
+FICLONE = 0x40049409
+# Windows ioctl that clones extents between files on one ReFS volume
+FSCTL_DUPLICATE_EXTENTS_TO_FILE = 0x98344
+# Bytes cloned per FSCTL_DUPLICATE_EXTENTS_TO_FILE call, kept well below the 4 GiB per-call limit
+REFS_CLONE_CHUNK = 1024 * 1024 * 1024
+
+def _open_source(path):
+    """Open path for sequential reading, skipping access-time updates where permitted"""
+    noatime = getattr(os, "O_NOATIME", 0)
+    try:
+        return os.open(path, os.O_RDONLY | noatime)
+    except PermissionError:
+        # O_NOATIME is only allowed for the file's owner
+        if not noatime:
+            raise
+        return os.open(path, os.O_RDONLY)
+
+def _copy_file_range_loop(in_fd, out_fd, size):
+    """Copy with copy_file_range, which can reflink on filesystems that support it"""
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(in_fd, out_fd, min(FAST_COPY_CHUNK, size - offset), offset, offset)
+        if copied == 0:
+            raise OSError("copy_file_range stopped before end of file")
+        offset += copied
+
+def _sendfile_loop(in_fd, out_fd, size):
+    """Copy with sendfile, which keeps the data inside the kernel"""
+    offset = 0
+    os.lseek(out_fd, 0, os.SEEK_SET)
+    while offset < size:
+        sent = os.sendfile(out_fd, in_fd, offset, min(FAST_COPY_CHUNK, size - offset))
+        if sent == 0:
+            raise OSError("sendfile stopped before end of file")
+        offset += sent
+
+def _kernel_copy(src, dst):
+    """Copy src to dst without a userspace buffer, raising OSError if no kernel copy works"""
+    in_fd = _open_source(src)
+    try:
+        size = os.fstat(in_fd).st_size
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(in_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if hasattr(os, "posix_fallocate") and size:
+                # Reserve the full extent up front to avoid fragmentation
+                try:
+                    os.posix_fallocate(out_fd, 0, size)
+                except OSError:
+                    pass
+            
+            errors = []
+            for copy_loop in (_copy_file_range_loop, _sendfile_loop):
+                try:
+                    copy_loop(in_fd, out_fd, size)
+                    return
+                except (AttributeError, OSError) as e:
+                    errors.append(f"{copy_loop.__name__}: {e}")
+            raise OSError("; ".join(errors))
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+def fast_copy(src, dst):
+    """Copy file contents via copy_file_range or sendfile, falling back to shutil.copyfile"""
+    try:
+        _kernel_copy(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+    return dst
+
+def _clonefile_macos(src, dst):
+    """clonefile(2) on APFS; dst must not exist yet"""
+    import ctypes
+    libc = ctypes.CDLL("libSystem.dylib", use_errno=True)
+    libc.clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+    libc.clonefile.restype = ctypes.c_int
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), str(dst))
+
+def _ficlone_linux(src, dst):
+    """FICLONE ioctl; fails with EOPNOTSUPP/EXDEV when the filesystem or volume can't share extents"""
+    import fcntl
+    in_fd = os.open(src, os.O_RDONLY)
+    try:
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            fcntl.ioctl(out_fd, FICLONE, in_fd)
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+def _refs_volume_info(path):
+    """Return (filesystem name, cluster size) for the volume holding path"""
+    import ctypes
+    from ctypes import wintypes
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    root = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+    fs_name = ctypes.create_unicode_buffer(wintypes.MAX_PATH + 1)
+    if not kernel32.GetVolumeInformationW(root, None, 0, None, None, None, fs_name, len(fs_name)):
+        raise ctypes.WinError(ctypes.get_last_error())
+    sectors_per_cluster = wintypes.DWORD()
+    bytes_per_sector = wintypes.DWORD()
+    free_clusters = wintypes.DWORD()
+    total_clusters = wintypes.DWORD()
+    if not kernel32.GetDiskFreeSpaceW(root, ctypes.byref(sectors_per_cluster), ctypes.byref(bytes_per_sector),
+                                      ctypes.byref(free_clusters), ctypes.byref(total_clusters)):
+        raise ctypes.WinError(ctypes.get_last_error())
+    return fs_name.value, sectors_per_cluster.value * bytes_per_sector.value
+
+def _duplicate_extents_windows(src, dst):
+    """FSCTL_DUPLICATE_EXTENTS_TO_FILE, only attempted when both paths are on the same ReFS volume"""
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+    
+    if os.path.splitdrive(os.path.abspath(src))[0].lower() != os.path.splitdrive(os.path.abspath(dst))[0].lower():
+        raise OSError("source and target are on different volumes")
+    fs_name, cluster_size = _refs_volume_info(src)
+    if fs_name != "ReFS":
+        raise OSError(f"{fs_name} does not support block cloning")
+    
+    class DUPLICATE_EXTENTS_DATA(ctypes.Structure):
+        _fields_ = [("FileHandle", wintypes.HANDLE),
+                    ("SourceFileOffset", ctypes.c_longlong),
+                    ("TargetFileOffset", ctypes.c_longlong),
+                    ("ByteCount", ctypes.c_longlong)]
+    
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.DeviceIoControl.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD,
+                                         ctypes.c_void_p, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                         ctypes.c_void_p]
+    kernel32.DeviceIoControl.restype = wintypes.BOOL
+    
+    in_fd = os.open(src, os.O_RDONLY | os.O_BINARY)
+    try:
+        size = os.fstat(in_fd).st_size
+        out_fd = os.open(dst, os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_BINARY)
+        try:
+            # The target must already span the cloned range
+            os.ftruncate(out_fd, size)
+            # Clone ranges must be cluster-aligned; the last one may run past EOF
+            aligned_size = -(-size // cluster_size) * cluster_size
+            data = DUPLICATE_EXTENTS_DATA(msvcrt.get_osfhandle(in_fd), 0, 0, 0)
+            returned = wintypes.DWORD()
+            offset = 0
+            while offset < aligned_size:
+                data.SourceFileOffset = data.TargetFileOffset = offset
+                data.ByteCount = min(REFS_CLONE_CHUNK, aligned_size - offset)
+                if not kernel32.DeviceIoControl(msvcrt.get_osfhandle(out_fd), FSCTL_DUPLICATE_EXTENTS_TO_FILE,
+                                                ctypes.byref(data), ctypes.sizeof(data), None, 0,
+                                                ctypes.byref(returned), None):
+                    raise ctypes.WinError(ctypes.get_last_error())
+                offset += data.ByteCount
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+def clone_file(src, dst):
+    """Copy-on-write clone of src to dst, raising OSError when the filesystem can't do it"""
+    if sys.platform == "darwin":
+        _clonefile_macos(src, dst)
+    elif sys.platform.startswith("linux"):
+        _ficlone_linux(src, dst)
+    elif sys.platform == "win32":
+        _duplicate_extents_windows(src, dst)
+    else:
+        raise OSError(f"no clone primitive on {sys.platform}")
+
+def reflink(src, dst):
+    """Clone src to dst when the volume supports it, otherwise copy through fast_copy"""
+    try:
+        clone_file(src, dst)
+    except (OSError, AttributeError):
+        # AttributeError covers a libc without clonefile (macOS < 10.12)
+        return fast_copy(src, dst)
+    return dst
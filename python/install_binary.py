@@ -8,23 +8,61 @@ import os
 import platform
 from pathlib import Path
 
+from file_copy import clone_file, reflink
+
+# Resolved once; none of these change while the script runs
+_SYSTEM = platform.system()
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_EXE_SUFFIX = ".exe" if _SYSTEM == "Windows" else ""
+
+# Larger chunks for any userspace copy fallback; the binary is tens to hundreds of MB
+shutil.COPY_BUFSIZE = 1024 * 1024
+
 def get_executable_name():
     """Get the correct executable name for the current platform"""
-    if platform.system() == "Windows":
-        return "blink_detector.exe"
-    elif platform.system() == "Darwin":  # macOS
-        return "blink_detector"
-    else:  # Linux
-        return "blink_detector"
+    return f"blink_detector{_EXE_SUFFIX}"
+
+def copy_binary(source_path, target_path):
+    """Clone or fast-copy the binary through the OS, falling back to shutil.copy2"""
+    try:
+        if _SYSTEM == "Windows":
+            try:
+                clone_file(source_path, target_path)
+                return
+            except OSError:
+                pass
+            import ctypes
+            copy_file2 = ctypes.windll.kernel32.CopyFile2
+            copy_file2.argtypes = [ctypes.c_wchar_p, ctypes.c_wchar_p, ctypes.c_void_p]
+            copy_file2.restype = ctypes.c_long
+            hresult = copy_file2(str(source_path), str(target_path), None)
+            if hresult != 0:
+                raise OSError(f"CopyFile2 failed with HRESULT {hresult & 0xFFFFFFFF:#010x}")
+        else:
+            reflink(source_path, target_path)
+            shutil.copymode(source_path, target_path)
+    except Exception as e:
+        print(f"Fast copy failed ({e}), falling back to shutil.copy2")
+        shutil.copy2(source_path, target_path)
 
 def install_binary():
     """Copy the binary to Electron resources folder"""
     # Get paths
-    script_dir = Path(__file__).parent
+    script_dir = _SCRIPT_DIR
     binary_name = get_executable_name()
-    source_path = script_dir / "dist" / binary_name
     resources_dir = script_dir.parent / "electron" / "resources"
-    target_path = resources_dir / binary_name
+    bundle_dir = script_dir / "dist" / "blink_detector"
+    
+    # onedir builds produce dist/blink_detector/ holding the executable and _internal/
+    onedir = bundle_dir.is_dir()
+    if onedir:
+        source_path = bundle_dir
+        target_path = resources_dir / "blink_detector"
+        executable_path = target_path / binary_name
+    else:
+        source_path = script_dir / "dist" / binary_name
+        target_path = resources_dir / binary_name
+        executable_path = target_path
     
     # Check if binary exists
     if not source_path.exists():
@@ -37,17 +75,41 @@ def install_binary():
     
     # Copy the binary
     try:
-        shutil.copy2(source_path, target_path)
+        if onedir:
+            # Drop a previous onefile install; on Unix it sits exactly where the bundle directory goes
+            onefile_path = resources_dir / binary_name
+            if onefile_path.is_file():
+                onefile_path.unlink()
+            # Copy next to the old bundle, then swap it in, so files dropped from
+            # the new build don't linger in _internal/
+            staging_path = resources_dir / "blink_detector.partial"
+            if staging_path.exists():
+                shutil.rmtree(staging_path)
+            # symlinks=True keeps PyInstaller's library links (and macOS framework
+            # layout) as links instead of duplicating their targets
+            shutil.copytree(source_path, staging_path, symlinks=True, copy_function=copy_binary)
+            if target_path.is_dir():
+                shutil.rmtree(target_path)
+            os.replace(staging_path, target_path)
+            size = sum(f.stat().st_size for f in target_path.rglob("*") if f.is_file() and not f.is_symlink())
+        else:
+            # Drop a previous onedir install so Electron doesn't keep launching the old bundle
+            bundle_path = resources_dir / "blink_detector"
+            if bundle_path.is_dir():
+                shutil.rmtree(bundle_path)
+            copy_binary(source_path, target_path)
+            size = target_path.stat().st_size
         
         # Make executable on Unix systems
-        if platform.system() != "Windows":
-            os.chmod(target_path, 0o755)
+        if _SYSTEM != "Windows":
+            os.chmod(executable_path, 0o755)
         
-        size_mb = target_path.stat().st_size / (1024*1024)
-        print(f"OK: Binary installed successfully!")
-        print(f"Source: {source_path}")
-        print(f"Target: {target_path}")
-        print(f"Size: {size_mb:.1f} MB")
+        size_mb = size / (1024*1024)
+        print(f"""OK: Binary installed successfully!
+Source: {source_path}
+Target: {target_path}
+Executable: {executable_path}
+Size: {size_mb:.1f} MB""")
         
         return True
         
@@ -57,27 +119,27 @@ def install_binary():
 
 def create_platform_specific_install():
     """Create platform-specific installation instructions"""
-    current_platform = platform.system()
+    current_platform = _SYSTEM
     
     print(f"\nPlatform-specific installation for {current_platform}:")
     
     if current_platform == "Darwin":  # macOS
-        print("For macOS distribution:")
-        print("1. The binary is already built for macOS")
-        print("2. Copy to electron/resources/blink_detector")
-        print("3. Include in your .app bundle")
+        print("""For macOS distribution:
+1. The binary is already built for macOS
+2. Copy the dist/blink_detector folder to electron/resources/blink_detector
+3. Include in your .app bundle""")
         
     elif current_platform == "Windows":
-        print("For Windows distribution:")
-        print("1. The binary is built for Windows")
-        print("2. Copy to electron/resources/blink_detector.exe")
-        print("3. Include in your installer")
+        print("""For Windows distribution:
+1. The binary is built for Windows
+2. Copy the dist/blink_detector folder to electron/resources/blink_detector
+3. Include in your installer""")
         
     else:  # Linux
-        print("For Linux distribution:")
-        print("1. The binary is built for Linux")
-        print("2. Copy to electron/resources/blink_detector")
-        print("3. Include in your package")
+        print("""For Linux distribution:
+1. The binary is built for Linux
+2. Copy the dist/blink_detector folder to electron/resources/blink_detector
+3. Include in your package""")
 
 def main():
     print("Installing blink detector binary to Electron resources...")
@@ -85,28 +147,31 @@ def main():
     success = install_binary()
     
     if success:
-        print("\nSUCCESS: Installation complete!")
-        print("\nNext steps:")
-        print("1. Update your Electron code to use the binary")
-        print("2. Test the integration")
-        print("3. Build your Electron app for distribution")
+        print("""
+SUCCESS: Installation complete!
+
+Next steps:
+1. Update your Electron code to use the binary
+2. Test the integration
+3. Build your Electron app for distribution""")
         
         # Show platform-specific info
         create_platform_specific_install()
         
-        print(f"\nExample Electron code update:")
-        print("```javascript")
-        print("// Old way (Python script)")
-        print("const pythonProcess = spawn('python', ['python/blink_detector.py'], {")
-        print("  stdio: ['pipe', 'pipe', 'pipe']")
-        print("});")
-        print("")
-        print("// New way (standalone binary)")
-        print("const binaryPath = path.join(__dirname, 'resources', 'blink_detector');")
-        print("const binaryProcess = spawn(binaryPath, [], {")
-        print("  stdio: ['pipe', 'pipe', 'pipe']")
-        print("});")
-        print("```")
+        print("""
+Example Electron code update:
+```javascript
+// Old way (Python script)
+const pythonProcess = spawn('python', ['python/blink_detector.py'], {
+  stdio: ['pipe', 'pipe', 'pipe']
+});
+
+// New way (standalone binary; onedir bundle folder holding the executable)
+const binaryPath = path.join(__dirname, 'resources', 'blink_detector');
+const binaryProcess = spawn(path.join(binaryPath, 'blink_detector'), [], {
+  stdio: ['pipe', 'pipe', 'pipe']
+});
+```""")
     else:
         print("\nERROR: Installation failed. Please check the build process.")
 
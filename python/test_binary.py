@@ -5,14 +5,55 @@ Test script for the standalone blink detector binary
 
 import subprocess
 import json
+import os
+import queue
+import selectors
+import threading
 import time
 import signal
 import sys
 from pathlib import Path
 
+def _read_chunks_selector(fd, deadline):
+    """Yield stdout chunks until EOF or the deadline, waiting on the pipe instead of polling it"""
+    os.set_blocking(fd, False)
+    with selectors.DefaultSelector() as sel:
+        sel.register(fd, selectors.EVENT_READ)
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not sel.select(timeout=remaining):
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:  # EOF: the binary exited
+                return
+            yield chunk
+
+def _read_chunks_thread(fd, deadline):
+    """Windows can't select on pipes, so a helper thread does the blocking reads"""
+    chunks = queue.Queue()
+    
+    def pump():
+        while True:
+            chunk = os.read(fd, 65536)
+            chunks.put(chunk)
+            if not chunk:
+                return
+    
+    threading.Thread(target=pump, daemon=True).start()
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            chunk = chunks.get(timeout=remaining)
+        except queue.Empty:
+            return
+        if not chunk:  # EOF: the binary exited
+            return
+        yield chunk
+
 def test_binary():
     """Test the standalone binary"""
     binary_path = Path(__file__).parent / "dist" / "blink_detector"
+    # onedir builds put the executable inside dist/blink_detector/
+    if binary_path.is_dir():
+        binary_path = binary_path / ("blink_detector.exe" if sys.platform == "win32" else "blink_detector")
     
     if not binary_path.exists():
         print(f"ERROR: Binary not found at: {binary_path}")
@@ -29,33 +70,30 @@ def test_binary():
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+            bufsize=0  # raw byte pipes; stdin writes go straight to the fd
         )
         
         print("OK: Binary started successfully")
         
         # Send a test configuration
         test_config = {"ear_threshold": 0.20}
-        process.stdin.write(json.dumps(test_config) + "\n")
-        process.stdin.flush()
+        payload = (json.dumps(test_config) + "\n").encode("utf-8")
+        os.write(process.stdin.fileno(), payload)
         
         print("OK: Sent test configuration")
         
         # Read output for a few seconds
-        start_time = time.time()
+        deadline = time.monotonic() + 3  # Test for 3 seconds
         output_lines = []
+        pending = b""
         
-        while time.time() - start_time < 3:  # Test for 3 seconds
-            if process.stdout.readable():
-                line = process.stdout.readline()
-                if line:
-                    output_lines.append(line.strip())
-                    print(f"Output: {line.strip()}")
-            
-            # Check if process is still running
-            if process.poll() is not None:
-                break
+        read_chunks = _read_chunks_thread if sys.platform == "win32" else _read_chunks_selector
+        for chunk in read_chunks(process.stdout.fileno(), deadline):
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                line = line.decode("utf-8", errors="replace").strip()
+                output_lines.append(line)
+                print(f"Output: {line}")
         
         # Terminate the process
         process.terminate()
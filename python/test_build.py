@@ -6,6 +6,8 @@ Simple test script to verify the build process
 import os
 import sys
 import subprocess
+import importlib.metadata
+import importlib.util
 from pathlib import Path
 
 def test_build():
@@ -23,9 +25,12 @@ def test_build():
         "build_binary.py"
     ]
     
+    # One directory listing instead of a stat per file
+    with os.scandir(script_dir) as it:
+        present = {entry.name for entry in it}
+    
     for file in required_files:
-        file_path = script_dir / file
-        if file_path.exists():
+        if file in present:
             print(f"OK: {file} exists")
         else:
             print(f"ERROR: {file} missing")
@@ -33,31 +38,36 @@ def test_build():
     
     # Check if model directory exists
     model_dir = script_dir.parent / "electron" / "assets" / "models"
-    if model_dir.exists():
-        print(f"OK: Model directory exists: {model_dir}")
-        model_file = model_dir / "shape_predictor_68_face_landmarks.dat"
-        if model_file.exists():
-            print(f"OK: Model file exists: {model_file}")
-        else:
-            print(f"ERROR: Model file missing: {model_file}")
-            return False
-    else:
+    model_name = "shape_predictor_68_face_landmarks.dat"
+    try:
+        with os.scandir(model_dir) as it:
+            model_names = {entry.name for entry in it}
+    except FileNotFoundError:
         print(f"ERROR: Model directory missing: {model_dir}")
         return False
     
-    # Test PyInstaller installation
-    try:
-        import PyInstaller
-        print("OK: PyInstaller is installed")
-    except ImportError:
+    print(f"OK: Model directory exists: {model_dir}")
+    if model_name in model_names:
+        print(f"OK: Model file exists: {model_dir / model_name}")
+    else:
+        print(f"ERROR: Model file missing: {model_dir / model_name}")
+        return False
+    
+    # Test PyInstaller installation; find_spec avoids importing PyInstaller and its module graph
+    if importlib.util.find_spec("PyInstaller") is not None:
+        try:
+            version = importlib.metadata.version("pyinstaller")
+        except importlib.metadata.PackageNotFoundError:
+            version = "unknown version"
+        print(f"OK: PyInstaller is installed ({version})")
+    else:
         print("ERROR: PyInstaller is not installed")
         print("Available packages:")
         try:
-            import pkg_resources
-            installed_packages = [d.project_name for d in pkg_resources.working_set]
-            for pkg in installed_packages:
-                print(f"  - {pkg}")
-        except:
+            from importlib.metadata import distributions
+            installed_packages = sorted({d.metadata["Name"] for d in distributions() if d.metadata["Name"]})
+            print("\n".join(f"  - {pkg}" for pkg in installed_packages))
+        except Exception:
             print("  Could not list installed packages")
         return False
     
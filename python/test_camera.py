@@ -5,38 +5,81 @@ Simple camera test script to verify camera functionality
 import cv2
 import sys
 import json
+from pathlib import Path
+
+# Platform-specific backends, in the order they are tried
+if sys.platform == "win32":
+    _BACKENDS = (cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY)
+elif sys.platform == "darwin":
+    _BACKENDS = (cv2.CAP_AVFOUNDATION, cv2.CAP_ANY)
+else:
+    _BACKENDS = (cv2.CAP_V4L2, cv2.CAP_ANY)
+
+# Last (backend, index) pair that produced a frame, tried first on the next run
+CAMERA_CACHE_PATH = Path.home() / ".lumina_camera.json"
+
+def load_cached_camera():
+    """Return the cached (backend, index) pair, or None if there isn't a usable one"""
+    try:
+        with open(CAMERA_CACHE_PATH) as f:
+            cached = json.load(f)
+        return int(cached["backend"]), int(cached["index"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_cached_camera(backend, index):
+    try:
+        with open(CAMERA_CACHE_PATH, "w") as f:
+            json.dump({"backend": backend, "index": index}, f)
+    except OSError as e:
+        print(f"  Could not cache camera choice: {e}")
+
+def probe_camera(index, backend):
+    """Open the camera and return one frame, or None if it can't deliver one"""
+    cap = cv2.VideoCapture(index, backend)
+    try:
+        if not cap.isOpened():
+            print(f"  Failed to open camera {index} with backend {backend}")
+            return None
+        # grab() checks the camera is live without decoding; only a live camera gets retrieve()
+        if not cap.grab():
+            print(f"  Camera {index} opened but cannot read frames")
+            return None
+        ret, frame = cap.retrieve()
+        return frame if ret else None
+    finally:
+        cap.release()
 
 def test_camera():
     print("Testing camera functionality...")
     
-    # Platform-specific backends
-    if sys.platform == "win32":
-        backends = [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
-    elif sys.platform == "darwin":
-        backends = [cv2.CAP_AVFOUNDATION, cv2.CAP_ANY]
-    else:
-        backends = [cv2.CAP_V4L2, cv2.CAP_ANY]
+    cached = load_cached_camera()
+    if cached is not None:
+        backend, i = cached
+        print(f"Trying cached camera {i} with backend {backend}")
+        try:
+            frame = probe_camera(i, backend)
+            if frame is not None:
+                print(f"  SUCCESS! Camera {i} working with backend {backend}")
+                print(f"  Frame shape: {frame.shape}")
+                return True
+        except Exception as e:
+            print(f"  Exception testing camera {i} with backend {backend}: {str(e)}")
+        print("  Cached camera not available, scanning all cameras")
     
-    for backend in backends:
+    for backend in _BACKENDS:
         print(f"Testing backend: {backend}")
         
         for i in range(5):  # Check cameras 0-4
             print(f"  Trying camera index {i} with backend {backend}")
             
             try:
-                cap = cv2.VideoCapture(i, backend)
-                if cap.isOpened():
-                    ret, frame = cap.read()
-                    cap.release()
-                    
-                    if ret and frame is not None:
-                        print(f"  SUCCESS! Camera {i} working with backend {backend}")
-                        print(f"  Frame shape: {frame.shape}")
-                        return True
-                    else:
-                        print(f"  Camera {i} opened but cannot read frames")
-                else:
-                    print(f"  Failed to open camera {i} with backend {backend}")
+                frame = probe_camera(i, backend)
+                if frame is not None:
+                    print(f"  SUCCESS! Camera {i} working with backend {backend}")
+                    print(f"  Frame shape: {frame.shape}")
+                    save_cached_camera(backend, i)
+                    return True
             except Exception as e:
                 print(f"  Exception testing camera {i} with backend {backend}: {str(e)}")
     